@@ -23,6 +23,11 @@ Optional per-game exceptions:
 
 Debug:
 - Set env EXCEPTIONS_DEBUG=1 to print why specific entries are excluded/kept.
+
+HTTP cache:
+- API calls go through srwikisync.speedrun_api, whose ETag / Last-Modified cache
+  lives under .cache/sr-api/ in the repo; entries older than its TTL are
+  revalidated with a conditional GET (304 -> reuse the stored body).
 """
 
 from __future__ import annotations
@@ -30,19 +35,30 @@ from __future__ import annotations
 import argparse
 import itertools
 import json
+import operator
 import os
 import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Iterable, Tuple
+from typing import Any, Callable, Iterable, Tuple
 
-import requests
+# Shared helpers live in the srwikisync package; make src/ importable when the
+# script is run directly (python scripts/gen_mapping.py ...).
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+from srwikisync.mappings import list_mapping_files
+from srwikisync.speedrun_api import api_get_json, configure_cache
+from srwikisync.wikiterms import priority_substitute
 
 DEFAULT_API_BASE = "https://www.speedrun.com/api/v1"
 DEFAULT_UA = "SpeedrunWikiSync/0.3 (mapping generator)"
 
 _WIKI_PROTECTED_RE = re.compile(r"(\[\[.*?\]\]|\{\{.*?\}\})", flags=re.DOTALL)
-_TOKEN_PREFIX = "\u0007WIKITERM_TOKEN_"
-_TOKEN_SUFFIX = "\u0007"
+# Bound once: apply_wikiterms runs for every label, so skip the attribute lookup per call.
+_split_protected = _WIKI_PROTECTED_RE.split
+
+# Max concurrent category fetches in --all mode.
+FETCH_WORKERS = 8
 
 
 def repo_root() -> Path:
@@ -50,17 +66,33 @@ def repo_root() -> Path:
 
 
 def api_get(api_base: str, path: str, ua: str, params: dict | None = None) -> dict:
-    r = requests.get(
-        api_base + path,
-        params=params or {},
-        headers={"User-Agent": ua},
-        timeout=30,
-    )
-    r.raise_for_status()
-    return r.json()
+    # srwikisync's client: pooled session, rate limiting, retries and the ETag cache.
+    return api_get_json(api_base, path, ua, params=params, timeout=30)
+
+
+# path -> (st_mtime_ns, parsed JSON)
+_JSON_CACHE: dict[Path, tuple[int, Any]] = {}
 
+# section_id -> (parsed wikiterms JSON the terms were built from, terms)
+_WIKITERMS_CACHE: dict[str | None, tuple[Any, tuple[tuple[str, str], ...]]] = {}
 
-def load_wikiterms(section_id: str | None) -> list[tuple[str, str]]:
+
+def _cached_json(path: Path) -> Any:
+    """Parse a JSON file, reusing the previous parse while its mtime is unchanged.
+
+    The returned object is shared between callers and must not be mutated.
+    """
+    mtime = path.stat().st_mtime_ns
+    cached = _JSON_CACHE.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    data = json.loads(path.read_text(encoding="utf-8"))
+    _JSON_CACHE[path] = (mtime, data)
+    return data
+
+
+def load_wikiterms(section_id: str | None) -> tuple[tuple[str, str], ...]:
     """
     Load substitutions from configs/zeldawiki_wikiterms.json.
 
@@ -81,12 +113,19 @@ def load_wikiterms(section_id: str | None) -> list[tuple[str, str]]:
     - If section_id matches a key in "sections", that value is used
     - Else if "default" is provided, that is used
     - Else the entry is ignored
+
+    The file is parsed once (until its mtime changes) and the resolved, sorted
+    terms are cached per section id.
     """
     path = repo_root() / "configs" / "zeldawiki_wikiterms.json"
     if not path.exists():
-        return []
+        return ()
+
+    data = _cached_json(path)
+    cached = _WIKITERMS_CACHE.get(section_id)
+    if cached is not None and cached[0] is data:
+        return cached[1]
 
-    data = json.loads(path.read_text(encoding="utf-8"))
     if not isinstance(data, dict):
         raise SystemExit(f"Expected dict in {path}")
 
@@ -123,10 +162,14 @@ def load_wikiterms(section_id: str | None) -> list[tuple[str, str]]:
 
     # Longest-first avoids partial replacements breaking longer ones
     terms.sort(key=lambda kv: len(kv[0]), reverse=True)
-    return terms
+    result = tuple(terms)
+    _WIKITERMS_CACHE[section_id] = (data, result)
+    return result
 
 
-def load_exceptions_for_mapping(mapping: str) -> tuple[list[str], list[str], list[str], list[str], list[str], list[str]]:
+def load_exceptions_for_mapping(
+    mapping: str,
+) -> tuple[tuple[str, ...], tuple[str, ...], list[str], list[str], list[str], list[str]]:
     """
     Load optional per-mapping curation rules.
 
@@ -147,17 +190,19 @@ def load_exceptions_for_mapping(mapping: str) -> tuple[list[str], list[str], lis
 
     Note: label filtering only affects the displayed wiki_category_wikitext. It does NOT change
     which variable combinations are generated or stored in sr.variables.
+
+    deny/allow are returned lowercased and de-duplicated, ready for should_exclude_wikitext().
     """
     path = repo_root() / "mappings" / "zeldawiki" / "curation" / f"{mapping}.json"
     if not path.exists():
-        return ([], [], [], [], [], [])
+        return ((), (), [], [], [], [])
 
-    data = json.loads(path.read_text(encoding="utf-8"))
+    data = _cached_json(path)
 
-    def norm_list_lc(v: object) -> list[str]:
+    def norm_list_lc(v: object) -> tuple[str, ...]:
         if not isinstance(v, list):
-            return []
-        return [x.strip().lower() for x in v if isinstance(x, str) and x.strip()]
+            return ()
+        return tuple(dict.fromkeys(x.strip().lower() for x in v if isinstance(x, str) and x.strip()))
 
     def norm_list_raw(v: object) -> list[str]:
         if not isinstance(v, list):
@@ -166,7 +211,7 @@ def load_exceptions_for_mapping(mapping: str) -> tuple[list[str], list[str], lis
 
     # Legacy: list means deny-only
     if isinstance(data, list):
-        return (norm_list_lc(data), [], [], [], [], [])
+        return (norm_list_lc(data), (), [], [], [], [])
 
     if isinstance(data, dict):
         deny = norm_list_lc(data.get("contains"))
@@ -184,7 +229,9 @@ def load_exceptions_for_mapping(mapping: str) -> tuple[list[str], list[str], lis
     raise SystemExit(f"Invalid exceptions format in {path}")
 
 
-def should_exclude_wikitext(wiki_cat: str, deny: list[str], allow: list[str]) -> bool:
+def should_exclude_wikitext(
+    wiki_cat: str, deny: tuple[str, ...], allow: tuple[str, ...]
+) -> tuple[bool, list[str], list[str]]:
     """
     Scoped override semantics (case-insensitive):
 
@@ -193,62 +240,73 @@ def should_exclude_wikitext(wiki_cat: str, deny: list[str], allow: list[str]) ->
     - If both match:
         allow phrases ONLY override the deny terms they contain.
         Any other deny term still triggers exclusion.
+
+    deny/allow must already be lowercased (see load_exceptions_for_mapping()).
+
+    Returns (excluded, matched_denies, matched_allows). matched_allows is only
+    computed when some deny term matched (it is empty otherwise).
     """
     if not deny:
-        return False
+        return False, [], []
 
     lc = wiki_cat.lower()
-    matched_denies = [d for d in deny if d and d in lc]
+    matched_denies = [d for d in deny if d in lc]
     if not matched_denies:
-        return False
+        return False, [], []
 
-    matched_allows = [a for a in allow if a and a in lc] if allow else []
+    matched_allows = [a for a in allow if a in lc]
     if not matched_allows:
-        return True
+        return True, matched_denies, []
 
-    overridden: set[str] = set()
-    for a in matched_allows:
-        for d in matched_denies:
-            if d in a:
-                overridden.add(d)
+    overridden = {d for d in matched_denies for a in matched_allows if d in a}
 
     # Exclude if any matched deny is NOT overridden
-    return any(d not in overridden for d in matched_denies)
+    return any(d not in overridden for d in matched_denies), matched_denies, matched_allows
 
 
-def _protect_wiki_segments(text: str) -> tuple[str, list[str]]:
-    protected: list[str] = []
+# id(terms) -> (terms, substitute, first_chars); terms is kept to guard against id reuse.
+_WIKITERMS_MATCHERS: dict[
+    int, tuple[tuple[tuple[str, str], ...], Callable[[str], str], frozenset[str]]
+] = {}
 
-    def repl(m: re.Match) -> str:
-        protected.append(m.group(0))
-        return f"{_TOKEN_PREFIX}PROT_{len(protected)-1}{_TOKEN_SUFFIX}"
 
-    return _WIKI_PROTECTED_RE.sub(repl, text), protected
+def _wikiterms_matcher(terms: tuple[tuple[str, str], ...]) -> tuple[Callable[[str], str], frozenset[str]]:
+    """
+    Return (substitute, first_chars) applying terms in priority order (the order
+    of terms, i.e. longest first); see srwikisync.wikiterms.priority_substitute.
+    """
+    cached = _WIKITERMS_MATCHERS.get(id(terms))
+    if cached is not None and cached[0] is terms:
+        return cached[1], cached[2]
 
+    substitute, first_chars = priority_substitute(terms)
 
-def _restore_wiki_segments(text: str, protected: list[str]) -> str:
-    for i, seg in enumerate(protected):
-        text = text.replace(f"{_TOKEN_PREFIX}PROT_{i}{_TOKEN_SUFFIX}", seg)
-    return text
+    _WIKITERMS_MATCHERS[id(terms)] = (terms, substitute, first_chars)
+    return substitute, first_chars
 
 
-def apply_wikiterms(text: str, terms: list[tuple[str, str]]) -> str:
+def apply_wikiterms(text: str, terms: tuple[tuple[str, str], ...]) -> str:
     if not text or not terms:
         return text
 
-    working, protected = _protect_wiki_segments(text)
+    substitute, first_chars = _wikiterms_matcher(terms)
 
-    inserted: list[str] = []
-    for term, repl in terms:
-        if term and term in working:
-            token = f"{_TOKEN_PREFIX}INS_{len(inserted)}{_TOKEN_SUFFIX}"
-            inserted.append(repl)
-            working = working.replace(term, token)
+    # Most labels contain no term at all: bail out before any regex work.
+    if first_chars.isdisjoint(text):
+        return text
 
-    for i, repl in enumerate(inserted):
-        working = working.replace(f"{_TOKEN_PREFIX}INS_{i}{_TOKEN_SUFFIX}", repl)
+    # Nothing to protect: substitute over the whole string.
+    if "[[" not in text and "{{" not in text:
+        return substitute(text)
 
-    return _restore_wiki_segments(working, protected)
+    # split() with a capturing group alternates [plain, protected, plain, ...];
+    # only plain chunks are rewritten, so existing [[links]] / {{templates}} are
+    # left alone and inserted text is never re-scanned (no nesting).
+    parts = _split_protected(text)
+    for i in range(0, len(parts), 2):
+        if parts[i]:
+            parts[i] = substitute(parts[i])
+    return "".join(parts)
 
 
 def get_game_categories(api_base: str, ua: str, game_slug: str) -> list[dict]:
@@ -272,18 +330,17 @@ def iter_value_labels(var_obj: dict) -> list[Tuple[str, str]]:
     return out
 
 
-def cartesian_var_assignments(sub_vars: list[dict]) -> Iterable[Tuple[dict[str, str], list[Tuple[str, str]]]]:
+def cartesian_var_assignments(
+    sub_vars: list[dict],
+) -> tuple[tuple[str, ...], Iterable[Tuple[tuple[str, ...], tuple[str, ...]]]]:
     """
-    Yield all combinations of subcategory variable assignments.
+    Enumerate all combinations of subcategory variable assignments.
 
-    Returns:
-      - variables: {var_id: value_id} (used for API queries)
-      - labels:    [(var_id, label)] (used for building the wiki row label; can be filtered)
+    Returns (var_ids, combos):
+      - var_ids: ordered variable ids, shared by every combo
+      - combos:  iterable of (value_ids, labels), both aligned with var_ids
+                 (value_ids are used for API queries, labels for the wiki row label)
     """
-    if not sub_vars:
-        yield ({}, [])
-        return
-
     var_vals: list[Tuple[str, list[Tuple[str, str]]]] = []
     for v in sub_vars:
         var_id = v.get("id")
@@ -292,60 +349,69 @@ def cartesian_var_assignments(sub_vars: list[dict]) -> Iterable[Tuple[dict[str,
             var_vals.append((var_id, vals))
 
     if not var_vals:
-        yield ({}, [])
-        return
+        return (), [((), ())]
 
-    for combo in itertools.product(*(vals for _, vals in var_vals)):
-        variables: dict[str, str] = {}
-        labels: list[Tuple[str, str]] = []
-        for (var_id, _), (value_id, label) in zip(var_vals, combo):
-            variables[var_id] = value_id
-            labels.append((var_id, label))
-        yield (variables, labels)
+    var_ids = tuple(var_id for var_id, _ in var_vals)
+    value_ids = [tuple(value_id for value_id, _ in vals) for _, vals in var_vals]
+    labels = [tuple(label for _, label in vals) for _, vals in var_vals]
+
+    # Two products over parallel per-variable tuples walk the same index sequence,
+    # and each yields ready-made tuples, so no per-combo unpacking is needed.
+    return var_ids, zip(itertools.product(*value_ids), itertools.product(*labels))
+
+
+def _index_picker(indices: tuple[int, ...]) -> Callable[[tuple], tuple]:
+    """Return a callable that selects `indices` from a tuple (always returning a tuple)."""
+    if not indices:
+        return lambda t: ()
+    if len(indices) == 1:
+        i = indices[0]
+        return lambda t: (t[i],)
+    return operator.itemgetter(*indices)
 
 
 def format_wiki_category_wikitext(
-    cat_name: str,
-    sub_labels: list[Tuple[str, str]],
-    terms: list[tuple[str, str]],
-    *,
-    label_vars_keep: list[str] | None = None,
-    label_vars_drop: list[str] | None = None,
+    base: str,
+    labels: tuple[str, ...],
+    terms: tuple[tuple[str, str], ...],
+    label_cache: dict[str, str] | None = None,
 ) -> str:
     """
     Build the wiki row label.
 
-    sub_labels is [(var_id, label)].
+    base is the category name with wikiterms already applied (it is the same for
+    every combo of a category, so callers compute it once).
 
-    If label_vars_keep is provided and non-empty, only those var_ids are included in the label.
-    If label_vars_drop is provided and non-empty, those var_ids are excluded from the label.
+    labels are the subcategory value labels to display, already filtered by
+    label_vars_keep / label_vars_drop (see generate_per_game_entries()).
 
-    This only affects the display label; sr.variables still contains the full assignment.
+    label_cache, if given, memoizes apply_wikiterms() per label across calls.
     """
-    base = apply_wikiterms(cat_name, terms)
-
-    label_vars_keep = [v for v in (label_vars_keep or []) if v]
-    label_vars_drop = [v for v in (label_vars_drop or []) if v]
+    if not labels:
+        return base
 
-    filtered: list[str] = []
-    for var_id, lbl in sub_labels:
-        if label_vars_keep and var_id not in label_vars_keep:
-            continue
-        if label_vars_drop and var_id in label_vars_drop:
-            continue
-        filtered.append(lbl)
+    if label_cache is None:
+        label_cache = {}
 
-    if not filtered:
-        return base
+    subbed: list[str] = []
+    for lbl in labels:
+        sub = label_cache.get(lbl)
+        if sub is None:
+            sub = label_cache[lbl] = apply_wikiterms(lbl, terms)
+        subbed.append(sub)
 
-    joined = " / ".join(apply_wikiterms(lbl, terms) for lbl in filtered)
+    joined = " / ".join(subbed)
     return f"{base} {{{{Small|({joined})}}}}"
 
 
 def pick_categories_by_names(all_cats: list[dict], wanted_names: list[str]) -> list[dict]:
+    by_name: dict[str | None, list[dict]] = {}
+    for c in all_cats:
+        by_name.setdefault(c.get("name"), []).append(c)
+
     picked: list[dict] = []
     for name in wanted_names:
-        matches = [c for c in all_cats if c.get("name") == name]
+        matches = by_name.get(name, [])
         if len(matches) == 1:
             picked.append(matches[0])
         elif not matches:
@@ -358,20 +424,18 @@ def pick_categories_by_names(all_cats: list[dict], wanted_names: list[str]) -> l
 def generate_per_game_entries(
     section: str,
     game_slug: str,
-    api_base: str,
-    ua: str,
+    cats: list[dict],
     include_misc: bool,
     wanted_category_names: list[str] | None,
     all_categories: bool,
-    terms: list[tuple[str, str]],
-    deny: list[str],
-    allow: list[str],
+    terms: tuple[tuple[str, str], ...],
+    deny: tuple[str, ...],
+    allow: tuple[str, ...],
     label_vars_keep: list[str],
     label_vars_drop: list[str],
     query_vars_keep: list[str],
     query_vars_drop: list[str],
 ) -> list[dict[str, Any]]:
-    cats = get_game_categories(api_base, ua, game_slug)
     cats = [c for c in cats if c.get("type") == "per-game"]
     if not include_misc:
         cats = [c for c in cats if not c.get("misc")]
@@ -380,27 +444,44 @@ def generate_per_game_entries(
 
     debug = os.environ.get("EXCEPTIONS_DEBUG", "").strip() == "1"
 
-    out: list[dict[str, Any]] = []
+    # (wiki_cat, entry) pairs, so the final sort can key on itemgetter(0).
+    rows: list[tuple[str, dict[str, Any]]] = []
     seen_keys: set[tuple] = set()
+    # Value labels recur across combos and categories; substitute each one once.
+    label_cache: dict[str, str] = {}
     for c in chosen:
         cat_id = c["id"]
         cat_name = c["name"]
+        misc = bool(c.get("misc"))
+        base = apply_wikiterms(cat_name, terms)
         sub_vars = extract_subcategory_variables(c)
-
-        for variables_dict, labels in cartesian_var_assignments(sub_vars):
-            # Optional: filter variables used in the leaderboard query (sr.variables)
-            # This does NOT affect label rendering unless label_vars_* are also provided.
-            if query_vars_keep:
-                variables_dict = {k: v for k, v in variables_dict.items() if k in query_vars_keep}
-            if query_vars_drop:
-                variables_dict = {k: v for k, v in variables_dict.items() if k not in query_vars_drop}
-            wiki_cat = format_wiki_category_wikitext(cat_name, labels, terms, label_vars_keep=label_vars_keep, label_vars_drop=label_vars_drop)
-
-            excluded = should_exclude_wikitext(wiki_cat, deny, allow)
-            if debug and (excluded or any(d in wiki_cat.lower() for d in deny)):
-                lc = wiki_cat.lower()
-                md = [d for d in deny if d in lc]
-                ma = [a for a in allow if a in lc]
+        var_ids, combos = cartesian_var_assignments(sub_vars)
+
+        # Label filtering only depends on var_ids, so resolve it once per category.
+        # This only affects the display label; sr.variables still gets the full assignment.
+        pick_labels = _index_picker(
+            tuple(
+                i
+                for i, var_id in enumerate(var_ids)
+                if (not label_vars_keep or var_id in label_vars_keep) and var_id not in label_vars_drop
+            )
+        )
+
+        # Optional: filter variables used in the leaderboard query (sr.variables).
+        # This does NOT affect label rendering unless label_vars_* are also provided.
+        query_idx = tuple(
+            i
+            for i, var_id in enumerate(var_ids)
+            if (not query_vars_keep or var_id in query_vars_keep) and var_id not in query_vars_drop
+        )
+        query_var_ids = tuple(var_ids[i] for i in query_idx)
+        pick_query_values = _index_picker(query_idx)
+
+        for value_ids, labels in combos:
+            wiki_cat = format_wiki_category_wikitext(base, pick_labels(labels), terms, label_cache)
+
+            excluded, md, ma = should_exclude_wikitext(wiki_cat, deny, allow)
+            if debug and (excluded or md):
                 print(f"[exceptions] {'EXCLUDE' if excluded else 'KEEP'}: {wiki_cat}")
                 print(f"            matched_denies={md}")
                 print(f"            matched_allows={ma}")
@@ -408,46 +489,43 @@ def generate_per_game_entries(
             if excluded:
                 continue
 
-            # De-duplicate identical mapping entries (can happen when query_vars_drop removes a differentiator)
-
-            dedupe_key = (
-
-                section,
-
-                wiki_cat,
-
-                game_slug,
-
-                cat_id,
-
-                tuple(sorted((variables_dict or {}).items())),
-
-            )
-
+            # De-duplicate identical mapping entries (can happen when query_vars_drop removes a differentiator).
+            # section and game are fixed for this call and query_var_ids is fixed per category,
+            # so (cat_id, wiki_cat, query values) identifies an entry.
+            query_values = pick_query_values(value_ids)
+            dedupe_key = (cat_id, wiki_cat, query_values)
             if dedupe_key in seen_keys:
-
                 continue
-
             seen_keys.add(dedupe_key)
 
-
-            out.append(
-                {
-                    "section": section,
-                    "wiki_category_wikitext": wiki_cat,
-                    "sr": {
-                        "game": game_slug,
-                        "category_id": cat_id,
-                        "variables": variables_dict,
-                        "kind": "full-game",
-                        "category_name": cat_name,
-                        "misc": bool(c.get("misc")),
+            variables_dict = dict(zip(query_var_ids, query_values))
+            rows.append(
+                (
+                    wiki_cat,
+                    {
+                        "section": section,
+                        "wiki_category_wikitext": wiki_cat,
+                        "sr": {
+                            "game": game_slug,
+                            "category_id": cat_id,
+                            "variables": variables_dict,
+                            "kind": "full-game",
+                            "category_name": cat_name,
+                            "misc": misc,
+                        },
                     },
-                }
+                )
             )
 
-    out.sort(key=lambda e: e["wiki_category_wikitext"])
-    return out
+    rows.sort(key=operator.itemgetter(0))
+    return [entry for _, entry in rows]
+
+
+def write_mapping(path: str | Path, entries: list[dict[str, Any]]) -> None:
+    """Serialize entries in one go and write them with a single binary write."""
+    data = json.dumps(entries, ensure_ascii=False, indent=2).encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(data)
 
 
 def main() -> None:
@@ -488,6 +566,8 @@ def main() -> None:
     ap.add_argument("--user-agent", default=DEFAULT_UA)
 
     args = ap.parse_args()
+    # Keep the API cache under the repo, wherever the script is run from.
+    configure_cache(repo_root() / ".cache" / "sr-api")
 
     def split_excludes(values: list[str] | None) -> set[str]:
         out: set[str] = set()
@@ -503,17 +583,15 @@ def main() -> None:
     excludes = split_excludes(args.exclude)
 
     if args.all:
-        import glob
-
         out_dir = Path(args.out_dir)
-        paths = sorted(glob.glob(str(out_dir / "*.json")))
+        paths = list_mapping_files(out_dir)
         if not paths:
             raise SystemExit(f"No mapping JSON files found in {out_dir}")
 
-        total = 0
+        # Pass 1: read mappings and decide what to regenerate (no network).
+        jobs: list[tuple[Path, str, str, str]] = []
         for path in paths:
-            p = Path(path)
-            stem = p.stem
+            stem = path.stem
 
             try:
                 with open(path, "r", encoding="utf-8") as f:
@@ -544,33 +622,45 @@ def main() -> None:
                 print(f"[SKIP] {path}: couldn't infer section/game from mapping")
                 continue
 
-            # Section-scoped wikiterms
-            terms = load_wikiterms(section)
-
-            deny, allow, label_keep, label_drop, query_keep, query_drop = load_exceptions_for_mapping(stem)
-
-            entries = generate_per_game_entries(
-                section=section,
-                game_slug=game,
-                api_base=args.api_base,
-                ua=args.user_agent,
-                include_misc=not args.no_misc,
-                wanted_category_names=args.categories,
-                all_categories=args.all_categories,
-                terms=terms,
-                deny=deny,
-                allow=allow,
-                label_vars_keep=label_keep,
-                label_vars_drop=label_drop,
-                query_vars_keep=query_keep,
-                query_vars_drop=query_drop,
-            )
+            jobs.append((path, stem, section, game))
+
+        # Pass 2: fetch every game's categories concurrently, then generate in path order.
+        total = 0
+        if jobs:
+            with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(jobs))) as ex:
+                futures = {
+                    game: ex.submit(get_game_categories, args.api_base, args.user_agent, game)
+                    for game in dict.fromkeys(game for _, _, _, game in jobs)
+                }
+
+                for path, stem, section, game in jobs:
+                    cats = futures[game].result()
+
+                    # Section-scoped wikiterms
+                    terms = load_wikiterms(section)
+
+                    deny, allow, label_keep, label_drop, query_keep, query_drop = load_exceptions_for_mapping(stem)
+
+                    entries = generate_per_game_entries(
+                        section=section,
+                        game_slug=game,
+                        cats=cats,
+                        include_misc=not args.no_misc,
+                        wanted_category_names=args.categories,
+                        all_categories=args.all_categories,
+                        terms=terms,
+                        deny=deny,
+                        allow=allow,
+                        label_vars_keep=label_keep,
+                        label_vars_drop=label_drop,
+                        query_vars_keep=query_keep,
+                        query_vars_drop=query_drop,
+                    )
 
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(entries, f, ensure_ascii=False, indent=2)
+                    write_mapping(path, entries)
 
-            print(f"[OK  ] {path}: wrote {len(entries)} entries")
-            total += len(entries)
+                    print(f"[OK  ] {path}: wrote {len(entries)} entries")
+                    total += len(entries)
 
         print(f"Done. Wrote {total} total entries across {len(paths)} files.")
         return
@@ -582,11 +672,11 @@ def main() -> None:
     terms = load_wikiterms(args.section)
 
     deny, allow, label_keep, label_drop, query_keep, query_drop = load_exceptions_for_mapping(Path(args.out).stem)
+    cats = get_game_categories(args.api_base, args.user_agent, args.game)
     entries = generate_per_game_entries(
         section=args.section,
         game_slug=args.game,
-        api_base=args.api_base,
-        ua=args.user_agent,
+        cats=cats,
         include_misc=not args.no_misc,
         wanted_category_names=args.categories,
         all_categories=args.all_categories,
@@ -599,8 +689,7 @@ def main() -> None:
                 query_vars_drop=query_drop,
     )
 
-    with open(args.out, "w", encoding="utf-8") as f:
-        json.dump(entries, f, ensure_ascii=False, indent=2)
+    write_mapping(args.out, entries)
 
     print(f"Wrote {len(entries)} entries to {args.out}")
 
@@ -1,9 +1,9 @@
 import argparse
 import os
 import sys
-import glob
 from pathlib import Path
 
+from .mappings import list_mapping_files
 from .updater import run_update, load_yaml
 
 
@@ -20,7 +20,7 @@ def _split_excludes(values: list[str] | None) -> list[str]:
     return out
 
 
-def _should_exclude(mapping_path: str, mapping_entries, excludes: set[str]) -> bool:
+def _should_exclude(mapping_path: str | Path, mapping_entries, excludes: set[str]) -> bool:
     if not excludes:
         return False
 
@@ -113,7 +113,7 @@ def main():
     # Batch mode: run once per mapping file.
     if args.all:
         mapping_dir = Path(args.mapping_dir)
-        paths = sorted(glob.glob(str(mapping_dir / "*.json")))
+        paths = list_mapping_files(mapping_dir)
         if not paths:
             print(f"No mapping JSON files found in {mapping_dir}")
             sys.exit(1)
@@ -1,26 +1,34 @@
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from typing import Iterable
+
 from .speedrun_api import api_get_json
 
+# speedrun.com user id -> display name, shared by every mapping in a run.
+# Kept in memory only, so renamed accounts show up on the next run; reuse
+# across runs goes through speedrun_api's on-disk HTTP cache (TTL + ETag).
+_USER_CACHE: dict[str, str] = {}
+PREFETCH_WORKERS = 8
+
+
+@functools.lru_cache(maxsize=4096)
 def format_time(primary_t_seconds: float) -> str:
     # Convert seconds -> "3h 4m 49s" (include ms only if non-zero)
     total_ms = int(round(primary_t_seconds * 1000))
-    ms = total_ms % 1000
-    total_s = total_ms // 1000
-    s = total_s % 60
-    total_m = total_s // 60
-    m = total_m % 60
-    h = total_m // 60
-
-    parts = []
+    total_s, ms = divmod(total_ms, 1000)
+    total_m, s = divmod(total_s, 60)
+    h, m = divmod(total_m, 60)
+
     if h:
-        parts.append(f"{h}h")
-    if h or m:
-        parts.append(f"{m}m")
-    parts.append(f"{s}s")
-    if ms:
-        parts.append(f"{ms}ms")
-    return " ".join(parts)
+        base = f"{h}h {m}m {s}s"
+    elif m:
+        base = f"{m}m {s}s"
+    else:
+        base = f"{s}s"
+    return f"{base} {ms}ms" if ms else base
 
+@functools.lru_cache(maxsize=4096)
 def format_date(date_str: str | None) -> str:
     # speedrun.com: typically "YYYY-MM-DD". Return "Month D, YYYY".
     if not date_str:
@@ -32,7 +40,44 @@ def format_date(date_str: str | None) -> str:
 
 import requests
 
-def extract_runner_display(run: dict, api_base: str, user_agent: str, user_cache: dict[str, str]) -> str:
+def run_user_ids(run: dict) -> list[str]:
+    """Return the speedrun.com user ids of a run's registered (non-guest) players."""
+    return [p["id"] for p in run.get("players", []) if p.get("rel") == "user" and p.get("id")]
+
+
+def prefetch_users(
+    uids: Iterable[str],
+    api_base: str,
+    user_agent: str,
+    user_cache: dict[str, str] | None = None,
+) -> None:
+    """Resolve all not-yet-cached user ids concurrently into user_cache."""
+    if user_cache is None:
+        user_cache = _USER_CACHE
+
+    missing = [uid for uid in dict.fromkeys(uids) if uid not in user_cache]
+    if not missing:
+        return
+
+    def fetch(uid: str) -> tuple[str, str]:
+        u = api_get_json(api_base, f"/users/{uid}", user_agent)
+        return uid, u["data"]["names"]["international"]
+
+    # Results are stored from this thread only, so the cache needs no lock.
+    with ThreadPoolExecutor(max_workers=min(PREFETCH_WORKERS, len(missing))) as ex:
+        for uid, uname in ex.map(fetch, missing):
+            user_cache[uid] = uname
+
+
+def extract_runner_display(
+    run: dict,
+    api_base: str,
+    user_agent: str,
+    user_cache: dict[str, str] | None = None,
+) -> str:
+    if user_cache is None:
+        user_cache = _USER_CACHE
+
     players = run.get("players", [])
     names: list[str] = []
 
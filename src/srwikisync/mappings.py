@@ -0,0 +1,10 @@
+from pathlib import Path
+
+
+def list_mapping_files(directory: Path) -> list[Path]:
+    """Return the (non-hidden) *.json files directly inside directory, sorted."""
+    if not directory.is_dir():
+        return []
+    return sorted(
+        p for p in directory.iterdir() if p.suffix == ".json" and not p.name.startswith(".") and p.is_file()
+    )
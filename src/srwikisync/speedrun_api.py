@@ -1,18 +1,159 @@
+import hashlib
+import json
+import os
 import time
 import random
 import re
-from urllib.parse import urlparse, urljoin
+import threading
+from pathlib import Path
+from urllib.parse import urlencode, urlparse, urljoin
 
 import requests
+from requests.adapters import HTTPAdapter
 
 DEFAULT_TIMEOUT = 20
 
+# Shared keep-alive session: every API call reuses pooled connections to
+# speedrun.com instead of paying a TCP + TLS handshake per request.
+# Retries are handled in api_get_json(), so the adapter doesn't retry.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0))
+_SESSION.headers.update({"Accept": "application/json"})
+
+# speedrun.com's published limit is 100 requests per minute.
+DEFAULT_RATE_LIMIT = 100
+DEFAULT_BURST = 10
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens/sec refill, at most `capacity` banked.
+    acquire() blocks until a token is available.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            # Reserve the token even if we have to wait for it, so concurrent
+            # callers queue up behind each other instead of waking together.
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+
+_BUCKET = TokenBucket(DEFAULT_RATE_LIMIT / 60.0, DEFAULT_BURST)
+
+
+def configure_rate_limit(requests_per_minute: float, burst: float = DEFAULT_BURST) -> None:
+    """
+    Replace the shared limiter (e.g. from cfg["speedrun"]["rate_limit"] / ["burst"]).
+    Unchanged settings keep the current bucket, so `--all` doesn't get a fresh
+    burst for every mapping.
+    """
+    global _BUCKET
+    if requests_per_minute <= 0:
+        raise RuntimeError(f"speedrun.rate_limit must be greater than 0 (got {requests_per_minute})")
+    rate = requests_per_minute / 60.0
+    if _BUCKET.rate == rate and _BUCKET.capacity == burst:
+        return
+    _BUCKET = TokenBucket(rate, burst)
+
+
+# On-disk HTTP cache (cwd-relative by default). Responses with an
+# ETag / Last-Modified are stored; within expire_after seconds they are reused
+# outright, after that they are revalidated with a conditional GET (304 -> reuse).
+DEFAULT_CACHE_DIR = Path(".cache") / "sr-api"
+DEFAULT_CACHE_TTL = 300
+
+_CACHE_DIR: Path | None = DEFAULT_CACHE_DIR
+_CACHE_TTL: float = DEFAULT_CACHE_TTL
+
+
+def configure_cache(directory: str | Path | None, expire_after: float = DEFAULT_CACHE_TTL) -> None:
+    """Set the HTTP cache location and TTL (e.g. from cfg["speedrun"]["cache"]); None disables it."""
+    global _CACHE_DIR, _CACHE_TTL
+    _CACHE_DIR = Path(directory) if directory else None
+    _CACHE_TTL = expire_after
+
+
+def _cache_path(url: str, params: dict | None) -> Path | None:
+    if _CACHE_DIR is None:
+        return None
+    key = url + "?" + urlencode(sorted((params or {}).items()))
+    return _CACHE_DIR / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json"
+
+
+def _cache_load(path: Path | None) -> dict | None:
+    if path is None:
+        return None
+    try:
+        cached = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return cached if isinstance(cached, dict) and "body" in cached else None
+
+
+def _cache_fresh(cached: dict | None) -> bool:
+    return cached is not None and time.time() - cached.get("stored_at", 0) < _CACHE_TTL
+
+
+def _conditional_headers(headers: dict, cached: dict | None) -> dict:
+    if cached is None:
+        return headers
+    headers = dict(headers)
+    if cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
+    return headers
+
+
+def _cache_store(path: Path | None, etag: str | None, last_modified: str | None, body) -> None:
+    if path is None or not (etag or last_modified):
+        return
+    # Best effort: a failed cache write never fails the request.
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_text(
+            json.dumps(
+                {"etag": etag, "last_modified": last_modified, "stored_at": time.time(), "body": body},
+                ensure_ascii=False,
+            ),
+            encoding="utf-8",
+        )
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def _cached_response_json(r: requests.Response, path: Path | None) -> dict:
+    """Parse a 2xx JSON response and remember it under its validators."""
+    # json.loads takes the raw bytes and detects UTF-8/16/32 itself, which skips
+    # requests' text decoding (and its charset guessing when no charset is sent).
+    data = json.loads(r.content)
+    _cache_store(path, r.headers.get("ETag"), r.headers.get("Last-Modified"), data)
+    return data
+
 
 _META_REFRESH_RE = re.compile(r'''content=["']?[^"']*url=([^"'>\s]+)''', re.IGNORECASE)
 
+# A meta refresh lives in <head>, so only the start of the page is searched.
+_META_REFRESH_SCAN_LIMIT = 4096
+
 def _extract_meta_refresh_url(html: str) -> str | None:
     """Return the URL from a meta-refresh HTML page, if present."""
-    m = _META_REFRESH_RE.search(html or "")
+    m = _META_REFRESH_RE.search((html or "")[:_META_REFRESH_SCAN_LIMIT])
     if not m:
         return None
     return m.group(1).strip()
@@ -30,10 +171,11 @@ def _absolute_from_api_base(api_base: str, target: str) -> str:
     return urljoin(api_base, target)
 
 def _sleep_backoff(attempt: int) -> None:
-    # exponential backoff with jitter
-    base = 0.8 * (2 ** attempt)
-    jitter = random.uniform(0, 0.4)
-    time.sleep(min(10.0, base + jitter))
+    # exponential backoff with full jitter, so parallel workers that hit a
+    # 429/5xx together don't all retry at the same moment
+    cap = 10.0
+    base = 0.8
+    time.sleep(random.uniform(0, min(cap, base * (2 ** attempt))))
 
 def api_get_json(api_base: str, path: str, user_agent: str, params: dict | None = None, timeout: int = DEFAULT_TIMEOUT) -> dict:
     """
@@ -44,12 +186,23 @@ def api_get_json(api_base: str, path: str, user_agent: str, params: dict | None
       - timeouts / transient connection errors
     """
     url = f"{api_base}{path}"
-    headers = {"User-Agent": user_agent, "Accept": "application/json"}
+    headers = {"User-Agent": user_agent}
+
+    cache_path = _cache_path(url, params)
+    cached = _cache_load(cache_path)
+    if _cache_fresh(cached):
+        return cached["body"]
 
     last_exc = None
     for attempt in range(5):
         try:
-            r = requests.get(url, params=params or {}, headers=headers, timeout=timeout)
+            _BUCKET.acquire()
+            r = _SESSION.get(url, params=params or {}, headers=_conditional_headers(headers, cached), timeout=timeout)
+
+            # Not modified since we cached it
+            if r.status_code == 304 and cached is not None:
+                _cache_store(cache_path, cached.get("etag"), cached.get("last_modified"), cached["body"])
+                return cached["body"]
 
             # Rate limit
             if r.status_code == 429:
@@ -72,18 +225,31 @@ def api_get_json(api_base: str, path: str, user_agent: str, params: dict | None
 
             # speedrun.com sometimes returns an HTML meta-refresh redirect when a slug is used
             # (e.g. /games/<abbrev> -> /games/<id>). If we see HTML, follow it once.
+            # JSON (the usual case) is parsed directly, without decoding r.text first;
+            # the body is only sniffed when the server didn't send a Content-Type.
             content_type = (r.headers.get("Content-Type") or "").lower()
-            body = r.text or ""
-            if "text/html" in content_type or body.lstrip().startswith("<!DOCTYPE html"):
-                target = _extract_meta_refresh_url(body)
+            if content_type.startswith("application/json"):
+                return _cached_response_json(r, cache_path)
+            if "text/html" in content_type or (
+                not content_type and (r.text or "").lstrip().startswith("<!DOCTYPE html")
+            ):
+                target = _extract_meta_refresh_url(r.text or "")
                 if target:
                     url2 = _absolute_from_api_base(api_base, target)
-                    r2 = requests.get(url2, params=params or {}, headers=headers, timeout=timeout)
+                    cache_path2 = _cache_path(url2, params)
+                    cached2 = _cache_load(cache_path2)
+                    if _cache_fresh(cached2):
+                        return cached2["body"]
+                    _BUCKET.acquire()
+                    r2 = _SESSION.get(url2, params=params or {}, headers=_conditional_headers(headers, cached2), timeout=timeout)
+                    if r2.status_code == 304 and cached2 is not None:
+                        _cache_store(cache_path2, cached2.get("etag"), cached2.get("last_modified"), cached2["body"])
+                        return cached2["body"]
                     r2.raise_for_status()
-                    return r2.json()
+                    return _cached_response_json(r2, cache_path2)
 
             # Normal JSON response
-            return r.json()
+            return _cached_response_json(r, cache_path)
 
         except (requests.Timeout, requests.ConnectionError) as e:
             last_exc = e
@@ -2,26 +2,40 @@ from __future__ import annotations
 
 import difflib
 import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 import pywikibot
 import yaml
 
-from .speedrun_api import get_leaderboard_top1
+from .speedrun_api import (
+    get_leaderboard_top1,
+    configure_rate_limit,
+    configure_cache,
+    DEFAULT_RATE_LIMIT,
+    DEFAULT_BURST,
+    DEFAULT_CACHE_DIR,
+    DEFAULT_CACHE_TTL,
+)
 from .formatter import (
     format_time,
     format_date,
     run_path_from_run,
     extract_runner_display,
+    prefetch_users,
+    run_user_ids,
 )
 from .wiki import (
     extract_section,
-    replace_speedrun_record_row,
-    remove_speedrun_record_row,
+    update_speedrun_record_rows,
     MissingWikiRowError,
     scaffold_rows,
 )
 
+# Concurrent leaderboard fetches per section (overridable via speedrun.max_workers).
+DEFAULT_MAX_WORKERS = 8
+
 
 def load_yaml(path: str) -> dict[str, Any]:
     with open(path, "r", encoding="utf-8") as f:
@@ -44,6 +58,27 @@ def unified_diff(old: str, new: str, fromfile: str = "wiki_old", tofile: str = "
     return "\n".join(lines)
 
 
+def print_unified_diff(old: str, new: str, fromfile: str = "wiki_old", tofile: str = "wiki_new") -> None:
+    """
+    Stream the same text as print(unified_diff(...)) to stdout, line by line,
+    without building the whole diff string in memory.
+    """
+    lines = difflib.unified_diff(
+        old.splitlines(True),
+        new.splitlines(True),
+        fromfile=fromfile,
+        tofile=tofile,
+        lineterm="",
+    )
+    write = sys.stdout.write
+    sep = ""
+    for line in lines:
+        write(sep)
+        write(line)
+        sep = "\n"
+    write("\n")
+
+
 def build_section_block(full_text: str, section_name: str) -> str:
     """
     Return exactly the <section begin="X"/> ... <section end="X"/> block
@@ -78,67 +113,87 @@ def update_section_for_mapping(
     api_base: str,
     user_agent: str,
     no_blanks: bool = False,
+    max_workers: int = DEFAULT_MAX_WORKERS,
 ) -> tuple[str, bool]:
     """
     Update only the named <section begin="X"/>...<section end="X"/> block,
     replacing only those Speedrun Record rows whose first parameter matches
     mapping 'wiki_category_wikitext' exactly.
 
+    Leaderboards are fetched concurrently (up to max_workers at a time);
+    rows are then rewritten in mapping order against a single row index.
+
     Returns (new_text, changed).
     """
     prefix, body, suffix = extract_section(page_text, section_name)
     if not isinstance(body, str):
         raise RuntimeError(f"Section body is not a string (got {type(body)}). Check section extraction.")
 
-    new_body = body
-    user_cache: dict[str, str] = {}
+    entries = [e for e in mapping_entries if e.get("section") == section_name]
 
-    for entry in mapping_entries:
-        if entry.get("section") != section_name:
-            continue
-
-        wiki_cat = entry["wiki_category_wikitext"]
+    def run_key(entry: dict[str, Any]) -> tuple:
         sr = entry["sr"]
-        run = get_leaderboard_top1(
+        return (
+            sr["game"],
+            sr["category_id"],
+            sr.get("level_id"),
+            tuple(sorted((sr.get("variables") or {}).items())),
+        )
+
+    def fetch_top1(key: tuple) -> dict | None:
+        game, category_id, level_id, variables = key
+        return get_leaderboard_top1(
             api_base=api_base,
             user_agent=user_agent,
-            game=sr["game"],
-            category_id=sr["category_id"],
-            variables=sr.get("variables", {}),
-            level_id=sr.get("level_id"),
+            game=game,
+            category_id=category_id,
+            variables=dict(variables),
+            level_id=level_id,
         )
 
+    # Fetch every distinct leaderboard once (network-bound, so in parallel);
+    # entries that share a query share the result. Then resolve all runner
+    # ids in one concurrent batch before rendering rows.
+    keys = [run_key(e) for e in entries]
+    run_cache: dict[tuple, dict | None] = dict.fromkeys(keys)
+    if run_cache:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(run_cache)))) as ex:
+            run_cache = dict(zip(run_cache, ex.map(fetch_top1, run_cache)))
+    runs = [run_cache[k] for k in keys]
+    prefetch_users(
+        (uid for run in runs if run is not None for uid in run_user_ids(run)),
+        api_base,
+        user_agent,
+    )
+
+    updates: list[tuple[str, tuple[str, str, str, str] | None]] = []
+    for entry, run in zip(entries, runs):
+        wiki_cat = entry["wiki_category_wikitext"]
+        sr = entry["sr"]
+
         if run is None:
             # No verified run found for this filter.
             # If --no-blanks is enabled, prune any existing placeholder row.
             if no_blanks:
-                new_body = remove_speedrun_record_row(new_body, wiki_category_wikitext=wiki_cat)
+                updates.append((wiki_cat, None))
             continue
 
-        runner = extract_runner_display(run, api_base, user_agent, user_cache)
+        runner = extract_runner_display(run, api_base, user_agent)
         time_str = format_time(run["times"]["primary_t"])
         date_str = format_date(run.get("date"))
 
         game_slug = sr["game"]  # e.g. "tlozph"
         run_path = run_path_from_run(run, game_slug)
 
-        new_body = replace_speedrun_record_row(
-            new_body,
-            wiki_category_wikitext=wiki_cat,
-            runner=runner,
-            time_str=time_str,
-            date_str=date_str,
-            run_path=run_path,
-        )
+        updates.append((wiki_cat, (runner, time_str, date_str, run_path)))
 
-        if not isinstance(new_body, str):
-            raise RuntimeError(
-                f"Row replacement returned non-string (got {type(new_body)}). "
-                f"Check replace_speedrun_record_row() returns the updated body."
-            )
+    # Index the section's rows once and apply every replacement/removal in one pass.
+    new_body = update_speedrun_record_rows(body, updates)
 
-    new_text = prefix + new_body + suffix
-    return new_text, (new_text != page_text)
+    # Only the section body can differ, so compare that rather than the whole page.
+    if new_body == body:
+        return page_text, False
+    return prefix + new_body + suffix, True
 
 
 def infer_section_from_mapping(mapping_entries):
@@ -172,6 +227,23 @@ def run_update(
 
     api_base = cfg["speedrun"]["api_base"]
     user_agent = cfg["speedrun"]["user_agent"]
+    configure_rate_limit(
+        float(cfg["speedrun"].get("rate_limit", DEFAULT_RATE_LIMIT)),
+        float(cfg["speedrun"].get("burst", DEFAULT_BURST)),
+    )
+
+    # speedrun.cache: false disables the HTTP cache; a mapping may set dir / expire_after.
+    # Any other non-mapping value (true, empty) means the defaults.
+    cache_cfg = cfg["speedrun"].get("cache", {})
+    if cache_cfg is False:
+        configure_cache(None)
+    else:
+        if not isinstance(cache_cfg, dict):
+            cache_cfg = {}
+        configure_cache(
+            cache_cfg.get("dir", DEFAULT_CACHE_DIR),
+            float(cache_cfg.get("expire_after", DEFAULT_CACHE_TTL)),
+        )
 
     mapping_entries = load_mapping(mapping_path)
 
@@ -197,6 +269,7 @@ def run_update(
             api_base=api_base,
             user_agent=user_agent,
             no_blanks=no_blanks,
+            max_workers=int(cfg["speedrun"].get("max_workers", DEFAULT_MAX_WORKERS)),
         )
     except MissingWikiRowError as e:
         print(f"ABORT: The wiki section is missing at least one expected row: {e.missing_category_wikitext}")
@@ -219,8 +292,7 @@ def run_update(
         return 0
 
     # Dry run: show diff only
-    diff = unified_diff(old_text, new_text, fromfile=page_title, tofile=page_title)
-    print(diff)
+    print_unified_diff(old_text, new_text, fromfile=page_title, tofile=page_title)
 
     if dry_run or not write:
         # signal that changes exist (cron-friendly)
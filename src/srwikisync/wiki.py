@@ -1,70 +1,57 @@
+import functools
 import re
 
-def extract_section(text: str, name: str) -> tuple[str, str, str]:
-    pattern = re.compile(
-        rf'(?P<prefix>.*?<section\s+begin="{re.escape(name)}"\s*/>\s*)'
-        rf'(?P<body>.*?)'
-        rf'(?P<suffix>\s*<section\s+end="{re.escape(name)}"\s*/>.*)',
-        re.DOTALL
-    )
-    m = pattern.match(text)
-    if not m:
-        raise RuntimeError(
-            f'Section "{name}" not found.'
-        )
-    return m.group("prefix"), m.group("body"), m.group("suffix")
-
-
-def normalize_category_wikitext(s: str) -> str:
-    s = re.sub(r"\{\{Small\|\((.*?)\)\}\}", r"\1", s, flags=re.DOTALL)
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
-
+_SMALL_PAREN_RE = re.compile(r"\{\{Small\|\((.*?)\)\}\}", re.DOTALL)
+_WHITESPACE_RE = re.compile(r"\s+")
+_PARAM_TOKEN_RE = re.compile(r"\[\[|\]\]|\{\{|\}\}|\|")
+_BRACE_TOKEN_RE = re.compile(r"\{\{|\}\}")
 
-def _split_template_params(body: str) -> list[str]:
-    params: list[str] = []
-    buf: list[str] = []
-    i = 0
-    depth_tpl = 0
-    depth_link = 0
 
-    while i < len(body):
-        if body.startswith("[[", i):
-            depth_link += 1
-            buf.append("[[")
-            i += 2
-            continue
-        if body.startswith("]]", i) and depth_link > 0:
-            depth_link -= 1
-            buf.append("]]")
-            i += 2
-            continue
-        if body.startswith("{{", i):
-            depth_tpl += 1
-            buf.append("{{")
-            i += 2
-            continue
-        if body.startswith("}}", i) and depth_tpl > 0:
-            depth_tpl -= 1
-            buf.append("}}")
-            i += 2
+def _find_section_tag(text: str, kind: str, name: str, pos: int) -> tuple[int, int] | None:
+    """Find the first <section KIND="NAME"/> tag at or after pos; return (start, end) of the tag."""
+    needle = f'{kind}="{name}"'
+    while True:
+        i = text.find(needle, pos)
+        if i == -1:
+            return None
+        pos = i + 1
+
+        # '<section' + at least one whitespace char before the attribute
+        start = i
+        while start > 0 and text[start - 1].isspace():
+            start -= 1
+        if start == i or start < 8 or not text.startswith("<section", start - 8):
             continue
+        start -= 8
 
-        ch = body[i]
-        if ch == "|" and depth_tpl == 0 and depth_link == 0:
-            params.append("".join(buf))
-            buf = []
-            i += 1
-            continue
+        # optional whitespace then '/>' after it
+        end = i + len(needle)
+        while end < len(text) and text[end].isspace():
+            end += 1
+        if text.startswith("/>", end):
+            return start, end + 2
 
-        buf.append(ch)
-        i += 1
 
-    params.append("".join(buf))
-    return params
+def extract_section(text: str, name: str) -> tuple[str, str, str]:
+    begin = _find_section_tag(text, "begin", name, 0)
+    end = _find_section_tag(text, "end", name, begin[1]) if begin else None
+    if not end:
+        raise RuntimeError(
+            f'Section "{name}" not found.'
+        )
 
+    # Whitespace right after the begin tag belongs to the prefix and whitespace
+    # right before the end tag to the suffix.
+    body_start = begin[1]
+    while body_start < end[0] and text[body_start].isspace():
+        body_start += 1
+    body_end = end[0]
+    while body_end > body_start and text[body_end - 1].isspace():
+        body_end -= 1
+    return text[:body_start], text[body_start:body_end], text[body_end:]
 
 
+@functools.lru_cache(maxsize=4096)
 def normalize_category_wikitext(s: str) -> str:
     """Normalize category wikitext for matching purposes.
 
@@ -72,54 +59,41 @@ def normalize_category_wikitext(s: str) -> str:
     - Removes presentational parentheses
     - Collapses whitespace
     """
-    s = re.sub(r"\{\{Small\|\((.*?)\)\}\}", r"\1", s, flags=re.DOTALL)
+    s = _SMALL_PAREN_RE.sub(r"\1", s)
     s = s.replace("(", "").replace(")", "")
-    s = re.sub(r"\s+", " ", s).strip()
+    s = _WHITESPACE_RE.sub(" ", s).strip()
     return s
 
 
 def _split_template_params(body: str) -> list[str]:
     """Split template params by top-level '|' (not inside [[...]] or {{...}})."""
+    if "[[" not in body and "{{" not in body:
+        # Nothing nests, so every '|' is top-level.
+        return body.split("|")
+
     params: list[str] = []
-    buf: list[str] = []
-    i = 0
+    start = 0
     depth_tpl = 0
     depth_link = 0
 
-    while i < len(body):
-        if body.startswith("[[", i):
+    # Jump between tokens; a closer with nothing open is plain text.
+    for m in _PARAM_TOKEN_RE.finditer(body):
+        tok = m.group()
+        if tok == "|":
+            if depth_tpl == 0 and depth_link == 0:
+                params.append(body[start:m.start()])
+                start = m.end()
+        elif tok == "[[":
             depth_link += 1
-            buf.append("[[")
-            i += 2
-            continue
-        if body.startswith("]]", i) and depth_link > 0:
-            depth_link -= 1
-            buf.append("]]")
-            i += 2
-            continue
-
-        if body.startswith("{{", i):
+        elif tok == "{{":
             depth_tpl += 1
-            buf.append("{{")
-            i += 2
-            continue
-        if body.startswith("}}", i) and depth_tpl > 0:
+        elif tok == "]]":
+            if depth_link > 0:
+                depth_link -= 1
+        elif depth_tpl > 0:
             depth_tpl -= 1
-            buf.append("}}")
-            i += 2
-            continue
-
-        ch = body[i]
-        if ch == "|" and depth_tpl == 0 and depth_link == 0:
-            params.append("".join(buf))
-            buf = []
-            i += 1
-            continue
 
-        buf.append(ch)
-        i += 1
-
-    params.append("".join(buf))
+    params.append(body[start:])
     return params
 
 
@@ -130,32 +104,40 @@ def _iter_template_invocations(text: str, template_name: str):
     """
     needle = "{{" + template_name + "|"
     i = 0
-    n = len(text)
     while True:
         start = text.find(needle, i)
         if start == -1:
             return
-        j = start
         depth = 0
-        while j < n:
-            if text.startswith("{{", j):
+        # Jump from brace pair to brace pair instead of walking every character.
+        for m in _BRACE_TOKEN_RE.finditer(text, start):
+            if m.group() == "{{":
                 depth += 1
-                j += 2
-                continue
-            if text.startswith("}}", j):
-                depth -= 1
-                j += 2
-                if depth == 0:
-                    end = j
-                    yield start, end, text[start:end]
-                    i = end
-                    break
                 continue
-            j += 1
+            depth -= 1
+            if depth == 0:
+                end = m.end()
+                yield start, end, text[start:end]
+                i = end
+                break
         else:
             return
 
 
+def _find_row_by_norm(section_body: str, expected_norm: str) -> tuple[int, int, str] | None:
+    """Return (start, end, existing_cat) of the first row whose category normalizes to expected_norm."""
+    for start, end, full in _iter_template_invocations(section_body, "Speedrun Record"):
+        inner = full[len("{{Speedrun Record|"):-2]
+        params = _split_template_params(inner)
+        if not params:
+            continue
+        existing_cat = params[0]
+        if normalize_category_wikitext(existing_cat) != expected_norm:
+            continue
+        return start, end, existing_cat
+    return None
+
+
 def replace_speedrun_record_row(
     section_body: str,
     wiki_category_wikitext: str,
@@ -169,21 +151,13 @@ def replace_speedrun_record_row(
     Matching is tolerant of {{Small|(...)}} wrappers and presentational parentheses in the existing wiki row.
     When replacing, we preserve the existing category parameter formatting to avoid churn.
     """
-    expected_norm = normalize_category_wikitext(wiki_category_wikitext)
-
-    for start, end, full in _iter_template_invocations(section_body, "Speedrun Record"):
-        inner = full[len("{{Speedrun Record|"):-2]
-        params = _split_template_params(inner)
-        if not params:
-            continue
-        existing_cat = params[0]
-        if normalize_category_wikitext(existing_cat) != expected_norm:
-            continue
+    row = _find_row_by_norm(section_body, normalize_category_wikitext(wiki_category_wikitext))
+    if row is None:
+        raise MissingWikiRowError(wiki_category_wikitext)
 
-        replacement = f"{{{{Speedrun Record|{existing_cat}|{runner}|{time_str}|{date_str}|{run_path}}}}}"
-        return section_body[:start] + replacement + section_body[end:]
-
-    raise MissingWikiRowError(wiki_category_wikitext)
+    start, end, existing_cat = row
+    replacement = f"{{{{Speedrun Record|{existing_cat}|{runner}|{time_str}|{date_str}|{run_path}}}}}"
+    return section_body[:start] + replacement + section_body[end:]
 
 
 def remove_speedrun_record_row(section_body: str, wiki_category_wikitext: str) -> str:
@@ -195,27 +169,83 @@ def remove_speedrun_record_row(section_body: str, wiki_category_wikitext: str) -
     This is used by the updater when --no-blanks is enabled to prune scaffolded
     N/A rows for mapping entries that have no verified run.
     """
-    expected_norm = normalize_category_wikitext(wiki_category_wikitext)
-
+    row = _find_row_by_norm(section_body, normalize_category_wikitext(wiki_category_wikitext))
+    if row is None:
+        return section_body
+
+    # Remove the invocation and a single surrounding newline if present.
+    start, end, _ = row
+    before = section_body[:start]
+    after = section_body[end:]
+    if after.startswith("\n"):
+        after = after[1:]
+    elif before.endswith("\n"):
+        before = before[:-1]
+    return before + after
+
+
+def _build_row_index(section_body: str) -> tuple[list[str], dict[str, list[tuple[int, str]]]]:
+    """Split a section body around its {{Speedrun Record|...}} rows.
+
+    Returns (pieces, index): pieces alternates text between rows and the rows
+    themselves (rows sit at odd positions), and index maps each normalized
+    category to (piece position, existing category param) for its rows, in page order.
+    """
+    pieces: list[str] = []
+    index: dict[str, list[tuple[int, str]]] = {}
+    pos = 0
     for start, end, full in _iter_template_invocations(section_body, "Speedrun Record"):
         inner = full[len("{{Speedrun Record|"):-2]
         params = _split_template_params(inner)
         if not params:
             continue
-        existing_cat = params[0]
-        if normalize_category_wikitext(existing_cat) != expected_norm:
+        pieces.append(section_body[pos:start])
+        index.setdefault(normalize_category_wikitext(params[0]), []).append((len(pieces), params[0]))
+        pieces.append(full)
+        pos = end
+    pieces.append(section_body[pos:])
+    return pieces, index
+
+
+def update_speedrun_record_rows(
+    section_body: str,
+    updates: list[tuple[str, tuple[str, str, str, str] | None]],
+) -> str:
+    """Apply many row updates with a single scan of the section body.
+
+    Each update is (wiki_category_wikitext, (runner, time_str, date_str, run_path))
+    to replace a row, or (wiki_category_wikitext, None) to remove it. The result is
+    the same as calling replace_speedrun_record_row() / remove_speedrun_record_row()
+    once per update, in order (including which update raises MissingWikiRowError).
+    """
+    pieces, index = _build_row_index(section_body)
+
+    for wiki_cat, values in updates:
+        rows = index.get(normalize_category_wikitext(wiki_cat))
+        if not rows:
+            if values is None:
+                continue
+            raise MissingWikiRowError(wiki_cat)
+        i, existing_cat = rows[0]
+
+        if values is not None:
+            runner, time_str, date_str, run_path = values
+            pieces[i] = f"{{{{Speedrun Record|{existing_cat}|{runner}|{time_str}|{date_str}|{run_path}}}}}"
             continue
 
-        # Remove the invocation and a single surrounding newline if present.
-        before = section_body[:start]
-        after = section_body[end:]
-        if after.startswith("\n"):
-            after = after[1:]
-        elif before.endswith("\n"):
-            before = before[:-1]
-        return before + after
+        # Remove the row and a single surrounding newline if present
+        # (first non-empty piece after it, else last non-empty piece before it).
+        rows.pop(0)
+        pieces[i] = ""
+        j = next((k for k in range(i + 1, len(pieces)) if pieces[k]), None)
+        if j is not None and pieces[j].startswith("\n"):
+            pieces[j] = pieces[j][1:]
+            continue
+        j = next((k for k in range(i - 1, -1, -1) if pieces[k]), None)
+        if j is not None and pieces[j].endswith("\n"):
+            pieces[j] = pieces[j][:-1]
 
-    return section_body
+    return "".join(pieces)
 
 
 class MissingWikiRowError(RuntimeError):
@@ -1,8 +1,13 @@
 import json
 import re
-from typing import Dict, Any
+from typing import Any, Callable, Dict, Iterable
 
-LINK_RE = re.compile(r"\[\[.*?\]\]")  # minimal wiki-link matcher
+# id(terms) -> (private copy of terms, substitute function, first chars of all terms).
+# The copy is compared with terms on every hit, so a dict mutated in place (or a
+# new dict reusing the id) rebuilds the matcher. A run only uses a few terms
+# dicts (one per section), so keep the most recent handful.
+_TERMS_MATCHERS: Dict[int, tuple[Dict[str, str], Callable[[str], str], frozenset[str]]] = {}
+_TERMS_MATCHERS_MAX = 8
 
 
 def load_wikiterms(path: str | None, section_id: str | None = None) -> Dict[str, str]:
@@ -30,36 +35,37 @@ def load_wikiterms(path: str | None, section_id: str | None = None) -> Dict[str,
     if not path:
         return {}
 
-    with open(path, "r", encoding="utf-8") as f:
-        data: Any = json.load(f)
+    # json.loads decodes the bytes itself, skipping the text-mode decode layer.
+    with open(path, "rb") as f:
+        data: Any = json.loads(f.read())
 
     if not isinstance(data, dict):
         return {}
 
+    # Parsed JSON only holds exact dict/str types, so plain type() checks suffice.
     out: Dict[str, str] = {}
     for k, v in data.items():
-        if not isinstance(k, str) or not k:
+        if type(k) is not str or not k:
             continue
 
-        if isinstance(v, str):
+        tv = type(v)
+        if tv is str:
             out[k] = v
             continue
+        if tv is not dict:
+            continue
 
-        if isinstance(v, dict):
-            chosen: str | None = None
-
-            if section_id and isinstance(v.get("sections"), dict):
-                sv = v["sections"].get(section_id)
-                if isinstance(sv, str) and sv:
-                    chosen = sv
-
-            if chosen is None:
-                dv = v.get("default")
-                if isinstance(dv, str) and dv:
-                    chosen = dv
+        if section_id:
+            sections = v.get("sections")
+            if type(sections) is dict:
+                sv = sections.get(section_id)
+                if type(sv) is str and sv:
+                    out[k] = sv
+                    continue
 
-            if chosen is not None:
-                out[k] = chosen
+        dv = v.get("default")
+        if type(dv) is str and dv:
+            out[k] = dv
 
     return out
 
@@ -73,20 +79,155 @@ def apply_wikiterms_outside_links(text: str, terms: Dict[str, str]) -> str:
     if not text or not terms:
         return text
 
-    parts: list[tuple[str, str]] = []
+    substitute, first_chars = _terms_matcher(terms)
+
+    # A segment sharing no character with first_chars cannot contain a term,
+    # which is the common case: it is kept as-is without any regex work.
+    # Checking the whole text first skips link scanning for such texts too.
+    if first_chars.isdisjoint(text):
+        return text
+    if "[[" not in text:
+        # No links at all: the whole text is one outside segment.
+        return substitute(text)
+
+    # Rewrite each outside segment as soon as the next link is found,
+    # appending it and the untouched link straight to the output.
+    out: list[str] = []
     last = 0
-    for m in LINK_RE.finditer(text):
-        parts.append(("outside", text[last : m.start()]))
-        parts.append(("link", m.group(0)))
-        last = m.end()
-    parts.append(("outside", text[last:]))
-
-    keys = sorted(terms.keys(), key=len, reverse=True)
-
-    out = []
-    for kind, seg in parts:
-        if kind == "outside":
-            for k in keys:
-                seg = seg.replace(k, terms[k])
-        out.append(seg)
+    for start, end in _iter_link_spans(text):
+        seg = text[last:start]
+        out.append(seg if first_chars.isdisjoint(seg) else substitute(seg))
+        out.append(text[start:end])
+        last = end
+    seg = text[last:]
+    out.append(seg if first_chars.isdisjoint(seg) else substitute(seg))
     return "".join(out)
+
+
+def _iter_link_spans(text: str):
+    """
+    Yield (start, end) of each [[...]] link: from each "[[" to the first "]]"
+    after it (single "]" and newlines allowed inside), found with str.find.
+    """
+    pos = 0
+    while True:
+        start = text.find("[[", pos)
+        if start == -1:
+            return
+        close = text.find("]]", start + 2)
+        if close == -1:
+            return
+        yield start, close + 2
+        pos = close + 2
+
+
+def _terms_matcher(terms: Dict[str, str]) -> tuple[Callable[[str], str], frozenset[str]]:
+    """
+    Return (substitute, first_chars) for terms, applied longest term first
+    (see priority_substitute); a segment sharing no character with first_chars
+    cannot contain a match.
+    """
+    cached = _TERMS_MATCHERS.get(id(terms))
+    if cached is not None and cached[0] == terms:
+        return cached[1], cached[2]
+    # Everything below works from a private copy, never from the caller's dict.
+    lookup = dict(terms)
+    if len(lookup) == 1:
+        # A single term needs no regex: str.replace does the same left-to-right,
+        # non-overlapping substitution.
+        (term, repl), = lookup.items()
+        substitute = lambda seg: seg.replace(term, repl)
+        first_chars = frozenset(term[:1])
+    else:
+        # sorted() is stable, so equally long terms keep their file order.
+        substitute, first_chars = priority_substitute(
+            sorted(lookup.items(), key=lambda kv: len(kv[0]), reverse=True)
+        )
+    if len(_TERMS_MATCHERS) >= _TERMS_MATCHERS_MAX:
+        del _TERMS_MATCHERS[next(iter(_TERMS_MATCHERS))]
+    _TERMS_MATCHERS[id(terms)] = (lookup, substitute, first_chars)
+    return substitute, first_chars
+
+
+def priority_substitute(terms: Iterable[tuple[str, str]]) -> tuple[Callable[[str], str], frozenset[str]]:
+    """
+    Build substitute(text), which applies terms in priority order (the order of
+    terms, e.g. longest first): each term replaces all of its occurrences in
+    the text not already taken by an earlier term, and replaced text is never
+    matched again.
+
+    One trie-structured regex scan finds which terms occur at all (every term
+    that is a prefix of the longest term starting at some position), so only
+    those few are applied.
+
+    Returns (substitute, first_chars); first_chars holds the first character of
+    every term, so callers can skip text that cannot contain any match.
+    """
+    # term -> rank (position in priority order); duplicates keep the first.
+    ranks: Dict[str, int] = {}
+    ordered: list[tuple[str, str]] = []
+    for term, repl in terms:
+        if term and term not in ranks:
+            ranks[term] = len(ordered)
+            ordered.append((term, repl))
+
+    # term -> ranks of all terms that are prefixes of it (itself included)
+    prefix_ranks = {
+        term: [ranks[term[:i]] for i in range(1, len(term) + 1) if term[:i] in ranks]
+        for term in ranks
+    }
+    # Zero-width lookahead: the longest term starting at every position.
+    finditer = re.compile(f"(?=({trie_alternation(ranks)}))").finditer
+
+    def substitute(text: str) -> str:
+        found: set[int] = set()
+        for m in finditer(text):
+            found.update(prefix_ranks[m.group(1)])
+        if not found:
+            return text
+
+        # Alternating [plain, replacement, plain, ...]; only plain pieces are searched.
+        pieces = [text]
+        for rank in sorted(found):
+            term, repl = ordered[rank]
+            out: list[str] = []
+            for i, piece in enumerate(pieces):
+                if i % 2 or term not in piece:
+                    out.append(piece)
+                    continue
+                split = piece.split(term)
+                out.append(split[0])
+                for rest in split[1:]:
+                    out.append(repl)
+                    out.append(rest)
+            pieces = out
+        return "".join(pieces)
+
+    return substitute, frozenset(k[0] for k in ranks)
+
+
+def trie_alternation(keys: Iterable[str]) -> str:
+    """
+    Build a regex matching any of keys, structured as a character trie
+    (e.g. "Master Quest(?: Map)?"), so the engine follows one branch per
+    character instead of trying every key at every position. Optional tails
+    are greedy, so the longest key at a position wins.
+    """
+    trie: Dict[str, dict] = {}
+    for key in keys:
+        node = trie
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node[""] = {}  # end-of-key marker
+
+    def build(node: Dict[str, dict]) -> str:
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        if len(alts) == 1:
+            body = alts[0]
+            return f"(?:{body})?" if "" in node else body
+        body = "(?:" + "|".join(alts) + ")"
+        return body + "?" if "" in node else body
+
+    return build(trie)